@@ -2,8 +2,8 @@
 # Functions for parsing and rendering inline markup.
 # ------------------------------------------------------------------------------
 
+import functools
 import html
-import hashlib
 import re
 
 
@@ -11,26 +11,16 @@ import re
 # Regular expressions for identifying inline markup.
 # ------------------------------------------------------------------------------
 
-# *x*
-re_italic_sc = re.compile(r"\*(\S)\*")
+# *x* or *foo bar*. The tail is lazily-optional so the single-character form
+# is preferred -- a greedy tail would swallow the closing asterisk in input
+# like '*a* *b*'.
+re_italic = re.compile(r"\*(\S(?:.*?\S)??)\*", re.DOTALL)
 
-# *foo bar*
-re_italic_mc = re.compile(r"\*(\S.*?\S)\*", re.DOTALL)
+# **x** or **foo bar**
+re_bold = re.compile(r"\*{2}(\S(?:.*?\S)??)\*{2}", re.DOTALL)
 
-# **x**
-re_bold_sc = re.compile(r"\*{2}(\S)\*{2}")
-
-# **foo bar**
-re_bold_mc = re.compile(r"\*{2}(\S.*?\S)\*{2}", re.DOTALL)
-
-# ***x***
-re_bolditalic_sc = re.compile(r"\*{3}(\S)\*{3}")
-
-# ***foo bar***
-re_bolditalic_mc = re.compile(r"\*{3}(\S.*?\S)\*{3}", re.DOTALL)
-
-# `foo bar`
-re_backticks = re.compile(r"`(.+?)`", re.DOTALL)
+# ***x*** or ***foo bar***
+re_bolditalic = re.compile(r"\*{3}(\S(?:.*?\S)??)\*{3}", re.DOTALL)
 
 # [link text](http://example.com)
 re_link = re.compile(r"\[([^\]]+)\]\(([^\)]+)\)")
@@ -50,37 +40,46 @@ re_footnote_super = re.compile(r"\[\^([^\]]*?)\]")
 # [fn:ref] or [fn]
 re_footnote_span = re.compile(r"\[fn:?([^\]]*?)\]")
 
-# &amp; &#x27;
-re_entity = re.compile(r"&[#a-zA-Z0-9]+;")
-
-# html tags: <span>, </span>, <!-- comment -->, etc.
-re_html_tag = re.compile(r"<([a-zA-Z/][^>]*?|!--.*?--)>")
-
-# <http://example.com>
-re_bracketed_url = re.compile(r"<((?:https?|ftp)://[^>]+)>")
-
-# http://example.com
-re_bare_url = re.compile(r"""
-    (^|\s)
-    (https?|ftp)
-    (://[-A-Z0-9+&@#/%?=~_|\[\]\(\)!:,\.;]*[-A-Z0-9+&@#/%=~_|\[\]])
-    ($|\W)
-    """, re.VERBOSE | re.MULTILINE | re.IGNORECASE)
-
-# n-dash
-re_ndash = re.compile(r"((?<=\s)|\b|^)--(?=[ ]|\b|$)", re.MULTILINE)
-
-# m-dash
-re_mdash = re.compile(r"((?<=\s)|\b|^)---(?=[ ]|\b|$)", re.MULTILINE)
-
 # x^{2}
 re_superscript = re.compile(r"\^\{(.+?)\}")
 
 # H_{2}O
 re_subscript = re.compile(r"_\{(.+?)\}")
 
-# ``foo bar``
-re_verbatim = re.compile(r"``(.+?)``", re.DOTALL)
+# Combined scanner for the pre-escape passes, i.e. the spans that get hashed
+# out to protect them from the escaping and markup passes below. The
+# alternatives appear in the same order as the old sequential passes so the
+# same markup takes precedence at any given position, but the text is only
+# scanned once instead of five times.
+re_protected = re.compile(r"""
+    (?P<verbatim>(?s:``.+?``))
+    |(?P<backticks>(?s:`.+?`))
+    |(?P<burl><(?:https?|ftp)://[^>]+>)
+    |(?P<html><(?:[a-zA-Z/][^>]*?|!--.*?--)>)
+    |(?P<entity>&[#a-zA-Z0-9]+;)
+""", re.VERBOSE)
+
+# n-dash and m-dash. These run as a second pass over the tokenized text:
+# the sequential pipeline substituted dashes after the protected spans had
+# been replaced by word-character digests, so a dash at the seam of a
+# protected span sat at a \b boundary. The STX/ETX token frame bytes take
+# the digests' place here, so the assertions admit them explicitly.
+re_ndash = re.compile(r"(?:(?<=[\s\x03])|\b|^)--(?=[ \x02]|\b|$)", re.MULTILINE)
+re_mdash = re.compile(r"(?:(?<=[\s\x03])|\b|^)---(?=[ \x02]|\b|$)", re.MULTILINE)
+
+# A placeholder token generated by tokenize() below.
+re_token = re.compile('\x02\\d+\x03')
+
+# Any character that can trigger an inline rendering pass.
+re_trigger = re.compile(r"[*`\[<&^_]|--")
+
+# Bound .sub methods for the static-template passes, bound once at import so
+# each call skips the module-global and attribute lookups.
+sub_italic = re_italic.sub
+sub_bold = re_bold.sub
+sub_bolditalic = re_bolditalic.sub
+sub_superscript = re_superscript.sub
+sub_subscript = re_subscript.sub
 
 
 # ------------------------------------------------------------------------------
@@ -88,103 +87,135 @@ re_verbatim = re.compile(r"``(.+?)``", re.DOTALL)
 # ------------------------------------------------------------------------------
 
 
-# Entry point.
+# Entry point. Spans containing a '[' can read or mutate document state --
+# link references and footnote counters live in 'meta' -- so only bracket-free
+# spans are routed through the cache. For those, the output depends solely on
+# the text itself and the nl2br flag, so repeated spans (footer boilerplate,
+# repeated renders of the same document) are rendered once.
 def render(text, meta):
-    hashes = {}
-
-    text = render_verbatim(text, hashes)
-    text = render_backticks(text, hashes)
-    text = render_bracketed_urls(text, hashes)
-    text = render_inline_html(text, hashes)
-    text = render_html_entities(text, hashes)
-    text = render_dashes(text, hashes)
-
-    text = html.escape(text, False)
-
-    text = render_bolditalic(text)
-    text = render_bold(text)
-    text = render_italic(text)
-    text = render_footnotes(text, meta)
-    text = render_images(text)
-    text = render_ref_images(text, meta)
-    text = render_links(text)
-    text = render_ref_links(text, meta)
-    text = render_superscripts(text)
-    text = render_subscripts(text)
+    if '[' in text:
+        return render_text(text, meta)
+    return render_cacheable(text, 'nl2br' in meta.get('context', []))
+
+
+@functools.lru_cache(maxsize=4096)
+def render_cacheable(text, nl2br):
+    return render_text(text, {'context': ['nl2br']} if nl2br else {})
+
+
+# Each rendering pass is gated on a cheap substring check so plain text skips
+# the regex scans entirely.
+def render_text(text, meta):
+
+    # Fast path: most prose contains no inline markup at all. The trigger
+    # scan has already ruled out '&' and '<' so only '>' can need escaping.
+    if re_trigger.search(text) is None:
+        if '>' in text:
+            text = html.escape(text, False)
+        if 'nl2br' in meta.get('context', []):
+            text = text.replace('\n', '<br>\n')
+        return text
+
+    tokens = {}
+
+    if '`' in text or '<' in text or '&' in text or '--' in text:
+        text = render_protected(text, tokens)
+
+    # Protected html and entities have been tokenized out above, so most
+    # texts have nothing left to escape.
+    if '&' in text or '<' in text or '>' in text:
+        text = html.escape(text, False)
+
+    if '*' in text:
+        text = render_bolditalic(text)
+        text = render_bold(text)
+        text = render_italic(text)
+    if '[' in text:
+        text = render_footnotes(text, meta)
+        text = render_images(text)
+        text = render_ref_images(text, meta)
+        text = render_links(text)
+        text = render_ref_links(text, meta)
+    if '^{' in text:
+        text = render_superscripts(text)
+    if '_{' in text:
+        text = render_subscripts(text)
 
     if 'nl2br' in meta.get('context', []):
         text = text.replace('\n', '<br>\n')
 
-    for key, value in hashes.items():
-        text = text.replace(key, value)
+    # Token-shaped sequences in the input text itself won't be in the map,
+    # so missing tokens are restored as themselves.
+    if tokens:
+        text = re_token.sub(lambda match: tokens.get(match.group(), match.group()), text)
 
     return text
 
 
-# Hashes a string, stores it as a {digest: string} pair in 'hashes', and
-# returns the digest.
-def hashstr(text, hashes):
-    digest = hashlib.sha1(text.encode()).hexdigest()
-    hashes[digest] = text
-    return digest
+# Stores a string as a {token: string} pair in 'tokens' and returns the
+# token -- a counter framed in STX/ETX bytes, which can't appear in normal
+# input text. Identical strings share a token, so a span that recurs
+# throughout a document only adds one entry to the restore pass.
+def tokenize(text, tokens, seen):
+    token = seen.get(text)
+    if token is None:
+        token = '\x02%s\x03' % len(tokens)
+        tokens[token] = text
+        seen[text] = token
+    return token
 
 
-def render_backticks(text, hashes):
-    def callback(match):
-        content = html.escape(match.group(1))
-        return hashstr('<code>%s</code>' % content, hashes)
-    return re_backticks.sub(callback, text)
+# Runs the combined scanner over the text, tokenizing each protected span.
+# Dispatches on the name of the matching alternative.
+def render_protected(text, tokens):
 
+    # Reverse map from protected content to its token, shared by tokenize()
+    # so repeated spans -- and the constant dash replacements -- are only
+    # tokenized once.
+    seen = {}
 
-def render_bracketed_urls(text, hashes):
     def callback(match):
-        url = '<a href="%s">%s</a>' % (match.group(1), match.group(1))
-        return hashstr(url, hashes)
-    return re_bracketed_url.sub(callback, text)
-
-
-def render_inline_html(text, hashes):
-    return re_html_tag.sub(lambda match: hashstr(match.group(), hashes), text)
-
-
-def render_verbatim(text, hashes):
-    return re_verbatim.sub(lambda match: hashstr(match.group(1), hashes), text)
-
-
-def render_html_entities(text, hashes):
-    return re_entity.sub(lambda match: hashstr(match.group(), hashes), text)
+        kind = match.lastgroup
+        span = match.group()
+        if kind == 'verbatim':
+            return tokenize(span[2:-2], tokens, seen)
+        elif kind == 'backticks':
+            content = html.escape(span[1:-1])
+            return tokenize(f'<code>{content}</code>', tokens, seen)
+        elif kind == 'burl':
+            url = span[1:-1]
+            return tokenize(f'<a href="{url}">{url}</a>', tokens, seen)
+        else:
+            return tokenize(span, tokens, seen)
 
+    text = re_protected.sub(callback, text)
 
-def render_dashes(text, hashes):
-    text = re_ndash.sub(hashstr("&ndash;", hashes), text)
-    text = re_mdash.sub(hashstr("&mdash;", hashes), text)
+    # Substitute dashes once the spans above are tokenized out, matching
+    # the sequential pipeline's pass order.
+    if '--' in text:
+        text = re_ndash.sub(lambda m: tokenize('&ndash;', tokens, seen), text)
+        text = re_mdash.sub(lambda m: tokenize('&mdash;', tokens, seen), text)
     return text
 
 
 def render_bold(text):
-    text = re_bold_sc.sub(r"<b>\1</b>", text)
-    text = re_bold_mc.sub(r"<b>\1</b>", text)
-    return text
+    return sub_bold(r"<b>\1</b>", text)
 
 
 def render_italic(text):
-    text = re_italic_sc.sub(r"<i>\1</i>", text)
-    text = re_italic_mc.sub(r"<i>\1</i>", text)
-    return text
+    return sub_italic(r"<i>\1</i>", text)
 
 
 def render_bolditalic(text):
-    text = re_bolditalic_sc.sub(r"<b><i>\1</i></b>", text)
-    text = re_bolditalic_mc.sub(r"<b><i>\1</i></b>", text)
-    return text
+    return sub_bolditalic(r"<b><i>\1</i></b>", text)
 
 
 def render_superscripts(text):
-    return re_superscript.sub(r"<sup>\1</sup>", text)
+    return sub_superscript(r"<sup>\1</sup>", text)
 
 
 def render_subscripts(text):
-    return re_subscript.sub(r"<sub>\1</sub>", text)
+    return sub_subscript(r"<sub>\1</sub>", text)
 
 
 def render_images(text):
@@ -197,14 +228,15 @@ def render_images(text):
 
 def render_ref_images(text, meta):
     def callback(match):
-        alt = html.escape(match.group(1))
-        ref = match.group(2).lower() if match.group(2) else alt.lower()
+        group = match.group
+        alt = html.escape(group(1))
+        ref = group(2).lower() if group(2) else alt.lower()
         url, title = meta.get('linkrefs', {}).get(ref, ('', ''))
         if title:
             title = html.escape(title)
-            return '<img alt="%s" src="%s" title="%s">' % (alt, url, title)
+            return f'<img alt="{alt}" src="{url}" title="{title}">'
         else:
-            return '<img alt="%s" src="%s">' % (alt, url)
+            return f'<img alt="{alt}" src="{url}">'
     return re_ref_img.sub(callback, text)
 
 
@@ -218,14 +250,15 @@ def render_links(text):
 
 def render_ref_links(text, meta):
     def callback(match):
-        text = match.group(1)
-        ref = match.group(2).lower() if match.group(2) else text.lower()
+        group = match.group
+        text = group(1)
+        ref = group(2).lower() if group(2) else text.lower()
         url, title = meta.get('linkrefs', {}).get(ref, ('', ''))
         if title:
             title = html.escape(title)
-            return '<a href="%s" title="%s">%s</a>' % (url, title, text)
+            return f'<a href="{url}" title="{title}">{text}</a>'
         else:
-            return '<a href="%s">%s</a>' % (url, text)
+            return f'<a href="{url}">{text}</a>'
     return re_ref_link.sub(callback, text)
 
 
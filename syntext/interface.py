@@ -3,6 +3,7 @@
 # ------------------------------------------------------------------------------
 
 import argparse
+import functools
 import sys
 import os
 import pprint
@@ -20,13 +21,16 @@ from . import toc
 
 
 def parse(text, meta):
-    expanded_text = text.expandtabs(meta.get('tabsize', 4))
-    line_stream = utils.LineStream(expanded_text)
+    # Only pay for tab expansion -- a full copy of the text -- if the text
+    # actually contains tabs.
+    if '\t' in text:
+        text = text.expandtabs(meta.get('tabsize', 4))
+    line_stream = utils.LineStream(text)
     root = nodes.Node()
-    root.children = parsers.BlockParser().parse(line_stream, meta)
+    root.children = parsers.block_parser.parse(line_stream, meta)
     tocbuilder = toc.TOCBuilder(root)
-    meta['toc'] = tocbuilder.toc()
-    meta['fulltoc'] = tocbuilder.fulltoc()
+    meta['toc'] = nodes.DeferredNode(tocbuilder.toc)
+    meta['fulltoc'] = nodes.DeferredNode(tocbuilder.fulltoc)
     html = root.render(meta)
     return html.strip(), root, meta
 
@@ -37,7 +41,19 @@ def parse(text, meta):
 
 
 def render(text, **meta):
-    html, _, _ = parse(text, meta)
+    try:
+        return cached_render(text, tuple(sorted(meta.items())))
+    except TypeError:
+        html, _, _ = parse(text, meta)
+        return html
+
+
+# Cached backend for render(). Callers that render the same input repeatedly,
+# e.g. web servers rendering live previews, get an O(1) hit instead of a full
+# reparse. Falls back to an uncached parse if a meta value is unhashable.
+@functools.lru_cache(maxsize=128)
+def cached_render(text, metaitems):
+    html, _, _ = parse(text, dict(metaitems))
     return html
 
 
@@ -112,9 +128,12 @@ def main():
         print(utils.title('AST'))
         print(root)
         print(utils.title('META'))
-        print(pprint.pformat(meta) + '\n')
+        # Stream the pretty-printed meta dict directly to stdout rather than
+        # building it as one giant string first.
+        pprint.PrettyPrinter(stream=sys.stdout).pprint(meta)
+        print()
         print(utils.title('HTML'))
-        print(html)
-    else:
-        print(html)
+
+    sys.stdout.write(html)
+    sys.stdout.write('\n')
 
@@ -6,6 +6,11 @@ import sys
 from . import inline
 
 
+# A handful of tag names cover almost every node in a document, so closing
+# tags are interned in a shared map instead of being formatted per render.
+closing_tags = {}
+
+
 # Input text is parsed into a tree of nodes.
 class Node:
 
@@ -20,8 +25,16 @@ class Node:
         return self.str()
 
     def str(self, depth=0):
-        output = ["·  " * depth]
-        output.append('%s' % self.__class__.__name__)
+        output = []
+        self.write_str(output, depth)
+        return ''.join(output)
+
+    # Appends this node's tree-view to the output buffer. Sharing a single
+    # buffer across the recursion avoids re-joining each subtree's string
+    # at every level above it.
+    def write_str(self, output, depth):
+        output.append("·  " * depth)
+        output.append(self.__class__.__name__)
         if self.tag:
             output.append(' ' + self.opening_tag())
         if self.text:
@@ -32,36 +45,48 @@ class Node:
                 output.append(' ' + text[:18] + "..." + text[-18:])
         output.append('\n')
         for child in self.children:
-            output.append(child.str(depth + 1))
-        return ''.join(output)
+            child.write_str(output, depth + 1)
 
     def render(self, meta):
         output = []
+        self.write_html(output, meta)
+        return ''.join(output)
 
+    # Appends this node's rendered html to the output buffer. As with
+    # write_str above, sharing one buffer across the recursion means the
+    # whole tree is joined into a string exactly once, at the top.
+    def write_html(self, output, meta):
         if self.tag:
-            output.append(self.opening_tag() + '\n')
+            output.append(self.opening_tag())
+            output.append('\n')
 
         if self.children:
-            output.append(''.join(child.render(meta) for child in self.children))
+            for child in self.children:
+                child.write_html(output, meta)
         elif self.text:
-            output.append(self.text.rstrip() + '\n')
+            output.append(self.text.rstrip())
+            output.append('\n')
 
         if self.tag and not self.is_void:
-            output.append(self.closing_tag() + '\n')
-
-        return ''.join(output)
+            output.append(self.closing_tag())
+            output.append('\n')
 
     def opening_tag(self):
+        if not self.attributes:
+            return f'<{self.tag}>'
         attributes = []
         for key, value in sorted(self.attributes.items()):
             if value is None:
-                attributes.append(' %s' % key)
+                attributes.append(f' {key}')
             else:
-                attributes.append(' %s="%s"' % (key, value))
-        return '<%s%s>' % (self.tag, ''.join(attributes))
+                attributes.append(f' {key}="{value}"')
+        return f'<{self.tag}{"".join(attributes)}>'
 
     def closing_tag(self):
-        return '</%s>' % self.tag
+        tag = closing_tags.get(self.tag)
+        if tag is None:
+            tag = closing_tags[self.tag] = '</%s>' % self.tag
+        return tag
 
     def append_child(self, node):
         self.children.append(node)
@@ -82,40 +107,53 @@ class TextNode(Node):
         Node.__init__(self)
         self.text = text
 
-    def render(self, meta):
-        return inline.render(self.text, meta) + '\n'
+    def write_html(self, output, meta):
+        output.append(inline.render(self.text, meta))
+        output.append('\n')
 
 
 # Comment nodes represent HTML comments.
 class CommentNode(Node):
 
-    def render(self, meta):
-        html = []
-        html.append('<!--\n')
-        html.append(self.text.rstrip())
-        html.append('\n')
-        html.append('-->\n')
-        return ''.join(html)
+    def write_html(self, output, meta):
+        output.append('<!--\n')
+        output.append(self.text.rstrip())
+        output.append('\n-->\n')
 
 
 # Insert nodes provide a mechanism for inserting generated content,
 # e.g. tables of contents or footnotes.
 class InsertNode(Node):
 
-    def render(self, meta):
+    def write_html(self, output, meta):
         if self.text in meta:
-            return meta[self.text].render(meta)
+            meta[self.text].write_html(output, meta)
         else:
             sys.stderr.write('Error: missing insert %s.\n' % repr(self.text))
-            return ''
+
+
+# Defers building a node tree until the first time it's rendered. Used for
+# generated content, e.g. tables of contents, that most documents never
+# actually insert.
+class DeferredNode(Node):
+
+    def __init__(self, callback):
+        Node.__init__(self)
+        self.callback = callback
+        self.node = None
+
+    def write_html(self, output, meta):
+        if self.node is None:
+            self.node = self.callback()
+        self.node.write_html(output, meta)
 
 
 # Turns on newline-to-linebreak mode for all children.
 class LinebreakNode(Node):
 
-    def render(self, meta):
+    def write_html(self, output, meta):
         context = meta.setdefault('context', [])
         context.append('nl2br')
-        rendered = ''.join(child.render(meta) for child in self.children)
+        for child in self.children:
+            child.write_html(output, meta)
         context.pop()
-        return rendered
@@ -2,15 +2,72 @@
 # Parsers for block-level structures.
 # ------------------------------------------------------------------------------
 
+import functools
 import re
 import sys
 import html
-import html.parser
 
 from . import nodes
 from . import utils
 
 
+# ------------------------------------------------------------------------------
+# Regular expressions for identifying block-level structures. Compiled once at
+# module level to keep compilation-cache lookups off the per-line parsing path.
+# ------------------------------------------------------------------------------
+
+# ### Heading Text ###
+re_heading = re.compile(r'([#]{1,6})[ ]+')
+
+# * foo
+re_compact_ul = re.compile(r'[ ]{0,3}([*•+-])([ ].+)?')
+
+# (*) foo
+re_block_ul = re.compile(r'[(]([*•+-])[)]')
+
+# 1. foo
+re_compact_ol = re.compile(r'[ ]{0,3}([#]|\d+)[.]([ ].+)?')
+
+# (1) foo
+re_block_ol = re.compile(r'[(]([#]|\d+)[)]')
+
+# #. foo / 1. foo (compact ordered-list item headers)
+re_compact_ol_hash = re.compile(r'[ ]{0,3}[#][.]([ ].+)?')
+re_compact_ol_num = re.compile(r'[ ]{0,3}\d+[.]([ ].+)?')
+
+# (#) foo / (1) foo (block ordered-list item headers)
+re_block_ol_hash = re.compile(r'[(][#][)]([ ].+)?')
+re_block_ol_num = re.compile(r'[(]\d+[)]([ ].+)?')
+
+# [[ Term ]]
+re_dl_term = re.compile(r'\[\[(.+)\]\]')
+
+# <tag ...>
+re_html_open = re.compile(r'<(\w+)[^>]*?>')
+
+# A complete opening, closing, or self-closing tag, e.g. <div class="x">,
+# </div>, <br/>. Quoted attribute values are matched as units so angle
+# brackets inside them don't end the tag early.
+re_html_tag = re.compile(r'''<(/?)([a-zA-Z][a-zA-Z0-9]*)(?:"[^"]*"|'[^']*'|[^<>"'])*?(/?)>''')
+
+# A html comment confined to a single line.
+re_html_comment = re.compile(r'<!--.*?-->')
+
+# [ref]: http://example.com
+re_link_ref = re.compile(r'\[([^\]]+)\][:][ ]*(\S+)?')
+
+# Heading tags indexed by level, so heading parsers reuse the same six
+# strings instead of concatenating a fresh tag per heading.
+h_tags = ('', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+
+# Returns the compiled item-header pattern for an unordered-list marker.
+# Cached so repeated lists don't recompile their header patterns per item.
+@functools.lru_cache(maxsize=16)
+def re_list_header(template, marker):
+    return re.compile(template % re.escape(marker))
+
+
 # ------------------------------------------------------------------------------
 # Parsers for individual block-level structures.
 # ------------------------------------------------------------------------------
@@ -24,18 +81,20 @@ from . import utils
 # symbols are optional.
 class HeadingParser:
 
+    prefixes = '#'
+
     def __call__(self, stream, meta):
-        match = re.match(r'([#]{1,6})[ ]+', stream.peek())
-        if match:
-            tag = 'h' + str(len(match.group(1)))
-            line = stream.next()
-            text = line.strip('#').strip()
-            if re.fullmatch(r'[-=─]+', text):
-                return True, None
-            else:
-                return True, nodes.Node(tag).append_child(nodes.TextNode(text))
-        else:
+        line = stream.peek()
+        numhashes = len(line) - len(line.lstrip('#'))
+        if numhashes == 0 or numhashes > 6 or line[numhashes:numhashes + 1] != ' ':
             return False, None
+        stream.next()
+        tag = h_tags[numhashes]
+        text = line[numhashes:].strip().rstrip('#').rstrip()
+        if text and not text.strip('-=─'):
+            return True, None
+        else:
+            return True, nodes.Node(tag).append_child(nodes.TextNode(text))
 
 
 # Deprecated: consumes an outlined, arbitrary-level heading of the form:
@@ -46,10 +105,13 @@ class HeadingParser:
 #
 class FancyHeadingParser:
 
+    prefixes = '-'
+
     def __call__(self, stream, meta):
-        if not re.fullmatch(r'-+', stream.peek()):
+        line1 = stream.peek()
+        if not line1 or line1.strip('-'):
             return False, None
-        line1 = stream.next()
+        stream.next()
 
         if stream.has_next():
             line2 = stream.next()
@@ -63,32 +125,39 @@ class FancyHeadingParser:
             stream.rewind(2)
             return False, None
 
-        if re.fullmatch(r'-+', line3):
-            match = re.match(r'([#]{1,6})[ ]+', line2)
+        if line3 and not line3.strip('-'):
+            match = re_heading.match(line2)
             if match:
-                text = nodes.TextNode(line2.strip('#').strip())
-                tag = 'h' + str(len(match.group(1)))
-                return True, nodes.Node(tag).append_child(text)
-        else:
-            stream.rewind(3)
-            return False, None
+                numhashes = match.end(1)
+                text = line2[numhashes:].strip().rstrip('#').rstrip()
+                tag = h_tags[numhashes]
+                return True, nodes.Node(tag).append_child(nodes.TextNode(text))
+
+        stream.rewind(3)
+        return False, None
 
 
 # Consumes a sequence of indented lines. The lines must be indented by at
 # least 4 spaces. The sequence may include blank lines.
 class IndentedCodeParser:
 
+    prefixes = ' '
+
     def __call__(self, stream, meta):
         if stream.peek().startswith('    '):
-            lines = utils.LineStream()
-            while stream.has_next():
-                nextline = stream.peek()
-                if nextline == '' or nextline.startswith('    '):
-                    lines.append(stream.next())
-                else:
-                    break
-            text = str(lines.dedent().trim())
-            text = html.escape(text, quote=False)
+            lines = stream.consume_while(
+                lambda line: not line or line.startswith('    ')
+            )
+            while lines and lines[0] == '':
+                lines.pop(0)
+            while lines and lines[-1] == '':
+                lines.pop()
+            indent = min(
+                (len(l) - len(l.lstrip(' ')) for l in lines if l), default=0
+            )
+            text = '\n'.join(line[indent:] for line in lines)
+            if '&' in text or '<' in text or '>' in text:
+                text = html.escape(text, quote=False)
             return True, nodes.Node('pre', text=text)
         return False, None
 
@@ -96,10 +165,53 @@ class IndentedCodeParser:
 # Consumes a single line of text, returning it as a Text node.
 class TextParser:
 
+    prefixes = None
+
     def __call__(self, stream, meta):
         return True, nodes.TextNode(stream.next())
 
 
+
+# Reads in a sequence of list items, each consisting of its header line plus
+# all subsequent blank or indented lines. An item ends at the end of the
+# stream, at a non-indented line, or at a line matching the header pattern.
+# Returns a list of LineStream instances, one per item.
+def read_list_items(stream, re_header):
+    items = []
+    header_match = re_header.fullmatch
+    while stream.has_next():
+        match = header_match(stream.peek())
+        if not match:
+            break
+        stream.next()
+
+        # Capture the item's indented content in a single slice. A line
+        # matching the header pattern starts the next item.
+        body = stream.consume_while(
+            lambda line: (not line or line[0] == ' ') and not header_match(line)
+        )
+        # Dedent only -- interior and edge blank lines are still meaningful
+        # here; the item is trimmed after the header content is prepended.
+        item = utils.LineStream(body)
+        item.dedent()
+
+        # Prepend the content of the header line.
+        if match.group(1):
+            item.prepend(match.group(1).strip())
+        items.append(item)
+    return items
+
+
+# Assembles the node tree representing a list.
+def assemble_list(tag, attributes, items, item_parser, meta):
+    node = nodes.Node(tag, attributes)
+    for item in items:
+        li = nodes.Node('li')
+        li.children = item_parser.parse(item.trim(), meta)
+        node.append_child(li)
+    return node
+
+
 # Consumes a compact unordered list.
 #
 # Each list item consists of its opening line plus all subsequent blank
@@ -119,96 +231,37 @@ class TextParser:
 # Switching to a different item marker starts a new list.
 class CompactUListParser:
 
+    prefixes = ' *•+-'
+
     def __call__(self, stream, meta):
-        match = re.fullmatch(r'[ ]{0,3}([*•+-])([ ].+)?', stream.peek())
+        match = re_compact_ul.fullmatch(stream.peek())
         if not match:
             return False, None
 
         # A new marker means a new list.
         marker = match.group(1)
-        re_header = r'[ ]{0,3}[%s]([ ].+)?' % marker
+        re_header = re_list_header(r'[ ]{0,3}[%s]([ ].+)?', marker)
 
-        # Read in each individual list item as a new LineStream instance.
-        items = []
-        while stream.has_next():
-            match = re.fullmatch(re_header, stream.peek())
-            if match:
-                stream.next()
-                item = utils.LineStream()
-                items.append(item)
-
-                # Read in any indented content.
-                while stream.has_next():
-                    if re.fullmatch(re_header, stream.peek()):
-                        break
-                    elif stream.peek().startswith(' ') or stream.peek() == '':
-                        item.append(stream.next())
-                    else:
-                        break
-
-                # Prepend the content of the header line.
-                item.dedent()
-                if match.group(1):
-                    item.prepend(match.group(1).strip())
-            else:
-                break
-
-        # Assemble the node tree representing the list.
-        parsers = (CompactUListParser(), CompactOListParser(), TextParser())
-        ul = nodes.Node('ul')
-        for item in items:
-            li = nodes.Node('li')
-            li.children = Parser(parsers).parse(item.trim(), meta)
-            ul.append_child(li)
-
-        return True, ul
+        items = read_list_items(stream, re_header)
+        return True, assemble_list('ul', None, items, compact_list_parser, meta)
 
 
 # Consumes a block-level unordered list.
 class BlockUListParser:
 
+    prefixes = '('
+
     def __call__(self, stream, meta):
-        match = re.match(r'^[(]([*•+-])[)]', stream.peek())
+        match = re_block_ul.match(stream.peek())
         if not match:
             return False, None
 
         # A new marker means a new list.
         marker = match.group(1)
-        re_header = r'[(][%s][)]([ ].+)?' % marker
+        re_header = re_list_header(r'[(][%s][)]([ ].+)?', marker)
 
-        # Read in each individual list item as a new LineStream instance.
-        items = []
-        while stream.has_next():
-            match = re.fullmatch(re_header, stream.peek())
-            if match:
-                stream.next()
-                item = utils.LineStream()
-                items.append(item)
-
-                # Read in any indented content.
-                while stream.has_next():
-                    if re.fullmatch(re_header, stream.peek()):
-                        break
-                    elif stream.peek().startswith(' ') or stream.peek() == '':
-                        item.append(stream.next())
-                    else:
-                        break
-
-                # Prepend the content of the header line.
-                item.dedent()
-                if match.group(1):
-                    item.prepend(match.group(1).strip())
-            else:
-                break
-
-        # Assemble the node tree representing the list.
-        ul = nodes.Node('ul')
-        for item in items:
-            li = nodes.Node('li')
-            li.children = BlockParser().parse(item.trim(), meta)
-            ul.append_child(li)
-
-        return True, ul
+        items = read_list_items(stream, re_header)
+        return True, assemble_list('ul', None, items, block_parser, meta)
 
 
 # Consumes a compact ordered list. The list item marker is '#.' or '<int>.'.
@@ -231,108 +284,49 @@ class BlockUListParser:
 # Switching to a different item marker starts a new list.
 class CompactOListParser:
 
+    prefixes = ' #0123456789'
+
     def __call__(self, stream, meta):
-        match = re.fullmatch(r'[ ]{0,3}([#]|\d+)[.]([ ].+)?', stream.peek())
+        match = re_compact_ol.fullmatch(stream.peek())
         if not match:
             return False, None
 
         # A new marker means a new list.
         marker = match.group(1)
         if marker == '#':
-            re_header = r'[ ]{0,3}[#][.]([ ].+)?'
+            re_header = re_compact_ol_hash
         else:
-            re_header = r'[ ]{0,3}\d+[.]([ ].+)?'
+            re_header = re_compact_ol_num
 
         # Do we have a custom start value?
         attributes = None if marker in ('#', '1') else {'start': marker}
 
-        # Read in each individual list item as a new LineStream instance.
-        items = []
-        while stream.has_next():
-            match = re.fullmatch(re_header, stream.peek())
-            if match:
-                stream.next()
-                item = utils.LineStream()
-                items.append(item)
-
-                # Read in any indented content.
-                while stream.has_next():
-                    if re.fullmatch(re_header, stream.peek()):
-                        break
-                    elif stream.peek().startswith(' ') or stream.peek() == '':
-                        item.append(stream.next())
-                    else:
-                        break
-
-                # Prepend the content of the header line.
-                item.dedent()
-                if match.group(1):
-                    item.prepend(match.group(1).strip())
-            else:
-                break
-
-        # Assemble the node tree representing the list.
-        parsers = (CompactUListParser(), CompactOListParser(), TextParser())
-        ol = nodes.Node('ol', attributes)
-        for item in items:
-            li = nodes.Node('li')
-            li.children = Parser(parsers).parse(item.trim(), meta)
-            ol.append_child(li)
-
-        return True, ol
+        items = read_list_items(stream, re_header)
+        return True, assemble_list('ol', attributes, items, compact_list_parser, meta)
 
 
 # Consumes a block-level ordered list.
 class BlockOListParser:
 
+    prefixes = '('
+
     def __call__(self, stream, meta):
-        match = re.match(r'^[(]([#]|\d+)[)]', stream.peek())
+        match = re_block_ol.match(stream.peek())
         if not match:
             return False, None
 
         # A new marker means a new list.
         marker = match.group(1)
         if marker == '#':
-            re_header = r'[(][#][)]([ ].+)?'
+            re_header = re_block_ol_hash
         else:
-            re_header = r'[(]\d+[)]([ ].+)?'
+            re_header = re_block_ol_num
 
         # Do we have a custom start value?
         attributes = None if marker in ('#', '1') else {'start': marker}
 
-        # Read in each individual list item as a new LineStream instance.
-        items = []
-        while stream.has_next():
-            match = re.fullmatch(re_header, stream.peek())
-            if match:
-                stream.next()
-                item = utils.LineStream()
-                items.append(item)
-
-                # Read in any indented content.
-                while stream.has_next():
-                    if re.fullmatch(re_header, stream.peek()):
-                        break
-                    elif stream.peek().startswith(' ') or stream.peek() == '':
-                        item.append(stream.next())
-                    else:
-                        break
-
-                # Prepend the content of the header line.
-                item.dedent()
-                if match.group(1):
-                    item.prepend(match.group(1).strip())
-            else:
-                break
-
-        # Assemble the node tree representing the list.
-        ol = nodes.Node('ol', attributes)
-        for item in items:
-            li = nodes.Node('li')
-            li.children = BlockParser().parse(item.trim(), meta)
-            ol.append_child(li)
-
-        return True, ol
+        items = read_list_items(stream, re_header)
+        return True, assemble_list('ol', attributes, items, block_parser, meta)
 
 
 # Consumes a definition list of the form:
@@ -347,14 +341,17 @@ class BlockOListParser:
 #
 class DefinitionListParser:
 
+    prefixes = '['
+
     def __call__(self, stream, meta):
-        match = re.fullmatch(r'\[\[(.+)\]\]', stream.peek())
+        match = re_dl_term.fullmatch(stream.peek())
         if not match:
             return False, None
 
         dl = nodes.Node('dl')
         while stream.has_next():
-            match = re.fullmatch(r'\[\[(.+)\]\]', stream.peek())
+            line = stream.peek()
+            match = re_dl_term.fullmatch(line) if line[:2] == '[[' else None
             if match:
                 stream.next()
 
@@ -365,17 +362,23 @@ class DefinitionListParser:
                 dt = nodes.Node('dt').append_child(nodes.TextNode(termtext))
                 div.append_child(dt)
 
-                definition = utils.LineStream()
-                while stream.has_next():
-                    if re.fullmatch(r'\[\[(.+)\]\]', stream.peek()):
-                        break
-                    elif stream.peek().startswith(' ') or stream.peek() == '':
-                        definition.append(stream.next())
-                    else:
-                        break
+                # A blank or indented line can never match the term pattern,
+                # so one consume_while captures the whole definition body.
+                deflines = stream.consume_while(
+                    lambda line: not line or line[0] == ' '
+                )
+
+                # Strip the common indent, then wrap the lines in a single
+                # LineStream for the parser.
+                indent = min(
+                    (len(l) - len(l.lstrip(' ')) for l in deflines if l),
+                    default=0
+                )
+                if indent:
+                    deflines = [line[indent:] for line in deflines]
 
                 dd = nodes.Node('dd')
-                dd.children = BlockParser().parse(definition.dedent(), meta)
+                dd.children = block_parser.parse(utils.LineStream(deflines), meta)
                 div.append_child(dd)
             else:
                 break
@@ -386,12 +389,10 @@ class DefinitionListParser:
 # Consumes a sequence of adjacent non-blank lines.
 class ParagraphParser:
 
+    prefixes = None
+
     def __call__(self, stream, meta):
-        lines = []
-        while stream.has_next():
-            if stream.peek() == '':
-                break
-            lines.append(stream.next())
+        lines = stream.consume_while(lambda line: line != '')
         text = nodes.TextNode('\n'.join(lines))
         return True, nodes.Node('p').append_child(text)
 
@@ -399,6 +400,8 @@ class ParagraphParser:
 # Consumes and discards a single blank line.
 class BlankLineParser:
 
+    prefixes = ''
+
     def __call__(self, stream, meta):
         if stream.peek() == '':
             stream.next()
@@ -409,15 +412,17 @@ class BlankLineParser:
 # Consumes one or more lines of raw block-level HTML.
 class HtmlParser:
 
-    html_block_tags = """
+    html_block_tags = frozenset(sys.intern(tag) for tag in """
         address article aside blockquote body canvas dd div dl fieldset
         figcaption figure footer form head h1 h2 h3 h4 h5 h6 header hgroup
         li main noscript ol output p pre script section style table tfoot
         title ul video html
-    """.split()
+    """.split())
+
+    prefixes = '<'
 
     def __call__(self, stream, meta):
-        match = re.match(r'<(\w+)[^>]*?>', stream.peek())
+        match = re_html_open.match(stream.peek())
         if match and match.group(1) in self.html_block_tags:
             tag = match.group(1)
         else:
@@ -426,39 +431,51 @@ class HtmlParser:
         first_line = stream.next()
         lines = [first_line]
 
-        html_parser = HtmlBlockTagParser(tag)
-        html_parser.feed(first_line)
-        if html_parser.done:
+        stripped, in_comment = self.strip_comments(first_line, False)
+        depth = self.count_tags(stripped, tag)
+        if depth <= 0:
             return True, nodes.Node(text=first_line)
 
         while stream.has_next():
             line = stream.next()
             lines.append(line)
-            html_parser.feed(line)
-            if html_parser.done:
-                return True, nodes.Node(text='\n'.join(lines))
+            # Lines without an opening angle bracket can't open or close a
+            # tag so we can skip scanning them, unless we're inside a
+            # comment and need to watch for its terminator.
+            if '<' in line or in_comment:
+                stripped, in_comment = self.strip_comments(line, in_comment)
+                if '<' in stripped:
+                    depth += self.count_tags(stripped, tag)
+                    if depth <= 0:
+                        return True, nodes.Node(text='\n'.join(lines))
 
         raise utils.SyntextError("Missing block-level HTML closing tag '</%s>'." % tag)
 
-
-# Helper class for the HTML parser above.
-class HtmlBlockTagParser(html.parser.HTMLParser):
-
-    def __init__(self, tag):
-        super().__init__()
-        self.tag = tag
-        self.stack = []
-        self.done = False
-
-    def handle_starttag(self, tag, attrs):
-        if tag == self.tag:
-            self.stack.append(tag)
-
-    def handle_endtag(self, tag):
-        if tag == self.tag:
-            self.stack.pop()
-        if len(self.stack) == 0:
-            self.done = True
+    # Removes commented-out content from the line. Comments can span lines
+    # so the open-comment state is threaded through; returns the stripped
+    # line and the updated state.
+    def strip_comments(self, line, in_comment):
+        if in_comment:
+            index = line.find('-->')
+            if index < 0:
+                return '', True
+            line = line[index + 3:]
+        if '<!--' in line:
+            line = re_html_comment.sub('', line)
+            index = line.find('<!--')
+            if index >= 0:
+                return line[:index], True
+        return line, False
+
+    # Returns the net number of 'tag' elements opened on the line, i.e.
+    # opening tags count +1, closing tags count -1. Self-closing tags are
+    # net zero. Comments should already have been stripped from the line.
+    def count_tags(self, line, tag):
+        depth = 0
+        for slash, name, selfclosing in re_html_tag.findall(line):
+            if not selfclosing and name.lower() == tag:
+                depth += -1 if slash else 1
+        return depth
 
 
 # Consumes a link reference. Title support is deprecated and will be removed in
@@ -473,8 +490,10 @@ class HtmlBlockTagParser(html.parser.HTMLParser):
 #
 class LinkRefParser:
 
+    prefixes = '['
+
     def __call__(self, stream, meta):
-        match = re.match(r'\[([^\]]+)\][:][ ]*(\S+)?', stream.peek())
+        match = re_link_ref.match(stream.peek())
         if match:
             stream.next()
         else:
@@ -483,20 +502,18 @@ class LinkRefParser:
         ref = match.group(1).lower()
         url = match.group(2) or ''
 
-        lines = []
-        while stream.has_next():
-            if stream.peek().startswith(' ') or stream.peek() == '':
-                line = stream.next()
-                if line:
-                    lines.append(line.strip())
-            else:
-                break
+        lines = [
+            line.strip()
+            for line in stream.consume_while(lambda l: not l or l[0] == ' ')
+            if line
+        ]
 
         if lines and not url:
             url = lines[0]
             lines.pop(0)
 
-        title = ' '.join(lines).strip()
+        # The fragments are already stripped so the join needs no final trim.
+        title = ' '.join(lines)
 
         meta.setdefault('linkrefs', {})[ref] = (url, title)
         return True, None
@@ -515,20 +532,19 @@ class LinkRefParser:
 # contain nested block-level structures.
 class ShorthandParser:
 
+    prefixes = ':'
+
     def __call__(self, stream, meta):
-        match = re.fullmatch(r':([^ ]+)([ ].+)?', stream.peek())
-        if match:
-            header = stream.next()
-        else:
+        # A shorthand header is a ':' followed immediately by a tag name;
+        # lines are rstripped on input so no trailing-space check is needed.
+        line = stream.peek()
+        if line[:1] != ':' or len(line) < 2 or line[1] == ' ':
             return False, None
+        header = stream.next()
 
-        content = utils.LineStream()
-        while stream.has_next():
-            if stream.peek().startswith(' ') or stream.peek() == '':
-                content.append(stream.next())
-            else:
-                break
-        content = content.trim().dedent()
+        content = utils.LineStream(stream.consume_while(
+            lambda line: not line or line[0] == ' '
+        )).normalize()
 
         if stream.has_next():
             nextline = stream.peek()
@@ -548,11 +564,15 @@ class ShorthandParser:
 #
 class TagParser:
 
+    prefixes = ':'
+
     def __call__(self, stream, meta):
         if not stream.peek().startswith('::: '):
             return False, None
 
-        header = stream.next().strip(':')
+        # The '::: ' prefix has already been verified, so slice it off and
+        # trim only the trailing colon decoration, if any.
+        header = stream.next()[4:].rstrip(':')
         elements = header.split(maxsplit=1)
         if len(elements) == 2:
             tag, argstring = elements[0], elements[1]
@@ -560,15 +580,14 @@ class TagParser:
             tag, argstring = elements[0], ''
         else:
             tag, argstring = '', ''
-        pargs, kwargs = utils.ArgParser().parse(argstring)
+        if argstring:
+            pargs, kwargs = utils.arg_parser.parse(argstring)
+        else:
+            pargs, kwargs = [], {}
 
-        content = utils.LineStream()
-        while stream.has_next():
-            if stream.peek().startswith(' ') or stream.peek() == '':
-                content.append(stream.next())
-            else:
-                break
-        content = content.trim().dedent()
+        content = utils.LineStream(stream.consume_while(
+            lambda line: not line or line[0] == ' '
+        )).normalize()
 
         if stream.has_next():
             nextline = stream.peek()
@@ -585,35 +604,68 @@ class TagParser:
 
 
 # Base parser class. Parses an input stream into a list of nodes.
+#
+# Each individual parser declares the set of characters its structures can
+# begin with via a `prefixes` attribute (None means any character). Lines are
+# dispatched to a shortlist of candidate parsers based on their first
+# character, skipping parsers that can't possibly match.
 class Parser:
 
     def __init__(self, parsers):
         self.parsers = parsers
+        self.dispatch = {}
 
     def parse(self, stream, meta):
         nodelist = []
-        while stream.has_next():
-
-            # Give each parser an opportunity to parse the stream.
-            for parser in self.parsers:
+        bad_lines = []
+        has_next, peek = stream.has_next, stream.peek
+        dispatch = self.dispatch
+        while has_next():
+
+            # Assemble the shortlist of candidate parsers for the line's
+            # first character, caching it for reuse.
+            first = peek()[:1]
+            candidates = dispatch.get(first)
+            if candidates is None:
+                candidates = dispatch[first] = [
+                    parser for parser in self.parsers
+                    if parser.prefixes is None or first in parser.prefixes
+                ]
+
+            # Give each candidate an opportunity to parse the stream. A
+            # successful parse returns either a node or None, e.g. for
+            # consumed-but-discarded structures like blank lines.
+            found_match = False
+            for parser in candidates:
                 found_match, result = parser(stream, meta)
                 if found_match:
-                    if isinstance(result, nodes.Node):
+                    if result is not None:
                         nodelist.append(result)
                     break
 
-            # If we have an unparsable line, print an error and skip it.
+            # If we have an unparsable line, note it and skip it.
             if not found_match:
-                sys.stderr.write("UNPARSEABLE: %s\n" % stream.next())
+                bad_lines.append(stream.next())
+
+        # Report unparseable lines in a single write.
+        if bad_lines:
+            sys.stderr.write(
+                ''.join('UNPARSEABLE: %s\n' % line for line in bad_lines)
+            )
 
-        # Merge adjacent text nodes.
-        mergedlist = []
+        # Merge runs of adjacent text nodes, joining their content in a single
+        # pass to avoid quadratic string concatenation.
+        mergedlist, textbuffer = [], []
         for node in nodelist:
-            if mergedlist and isinstance(mergedlist[-1], nodes.TextNode):
-                if isinstance(node, nodes.TextNode):
-                    mergedlist[-1].text += '\n' + node.text
-                    continue
-            mergedlist.append(node)
+            if isinstance(node, nodes.TextNode):
+                textbuffer.append(node.text)
+            else:
+                if textbuffer:
+                    mergedlist.append(nodes.TextNode('\n'.join(textbuffer)))
+                    textbuffer = []
+                mergedlist.append(node)
+        if textbuffer:
+            mergedlist.append(nodes.TextNode('\n'.join(textbuffer)))
 
         return mergedlist
 
@@ -621,7 +673,7 @@ class Parser:
 # Default parser for parsing the content of block-level elements.
 class BlockParser(Parser):
 
-    parser_list = [
+    parser_list = (
         BlankLineParser(),
         TagParser(),
         ShorthandParser(),
@@ -636,20 +688,34 @@ class BlockParser(Parser):
         LinkRefParser(),
         HtmlParser(),
         ParagraphParser(),
-    ]
+    )
 
     def __init__(self):
         self.parsers = self.parser_list
+        self.dispatch = {}
 
 
 # Default parser for parsing the content of leaf and inline elements.
 class InlineParser(Parser):
 
-    parser_list = [
+    parser_list = (
         TagParser(),
         ShorthandParser(),
         TextParser(),
-    ]
+    )
 
     def __init__(self):
         self.parsers = self.parser_list
+        self.dispatch = {}
+
+
+# ------------------------------------------------------------------------------
+# Shared parser instances. Parsers carry no per-document state so single
+# instances can be reused instead of being rebuilt for every nested block.
+# ------------------------------------------------------------------------------
+
+block_parser = BlockParser()
+inline_parser = InlineParser()
+compact_list_parser = Parser(
+    (CompactUListParser(), CompactOListParser(), TextParser())
+)
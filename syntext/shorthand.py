@@ -3,21 +3,22 @@
 # ------------------------------------------------------------------------------
 
 import html
-import re
+import sys
 
 from . import nodes
 from . import parsers
 from . import utils
 
 
-# Void elements have no content or closing tag.
-html_void_tags = set("""
+# Void elements have no content or closing tag. Tag names are interned so
+# membership tests can compare by identity.
+html_void_tags = set(sys.intern(tag) for tag in """
     area base br col embed hr img input link meta param source track wbr
 """.split())
 
 
 # Leaf elements cannot contain nested block-level content.
-html_leaf_tags = set("""
+html_leaf_tags = set(sys.intern(tag) for tag in """
     dt h1 h2 h3 h4 h5 h6 p title
     a abbr acronyn audio b bdi bdo big button canvas cite code data datalist
     del dfn em i iframe ins kbd label map mark meter noscript
@@ -27,15 +28,22 @@ html_leaf_tags = set("""
 
 
 # Raw elements contain text which should be included in the output as-is.
-html_raw_tags = set("script style".split())
+html_raw_tags = set(sys.intern(tag) for tag in "script style".split())
 
 
-# Process a tagged block.
+# Process a tagged block. The parser has already verified the ':tag' header
+# shape, so the tag and argstring can be split off by index.
 def process(header, line_stream, meta):
-    match = re.fullmatch(r':([^ ]+)([ ].+)?', header)
-    tag = match.group(1)
-    argstring = match.group(2) or ''
-    pargs, kwargs = utils.ArgParser().parse(argstring)
+    head = header[1:]
+    space = head.find(' ')
+    if space < 0:
+        tag, argstring = head, ''
+    else:
+        tag, argstring = head[:space], head[space + 1:]
+    if argstring:
+        pargs, kwargs = utils.arg_parser.parse(argstring)
+    else:
+        pargs, kwargs = [], {}
 
     if 'raw' in pargs:
         return nodes.Node(tag, kwargs, text=str(line_stream))
@@ -44,12 +52,12 @@ def process(header, line_stream, meta):
         node = nodes.Node(tag, kwargs, is_void=True)
     elif tag in html_leaf_tags:
         node = nodes.Node(tag, kwargs)
-        node.children = parsers.InlineParser().parse(line_stream, meta)
+        node.children = parsers.inline_parser.parse(line_stream, meta)
     elif tag in html_raw_tags:
         node = nodes.Node(tag, kwargs, text=str(line_stream))
     else:
         node = nodes.Node(tag, kwargs)
-        node.children = parsers.BlockParser().parse(line_stream, meta)
+        node.children = parsers.block_parser.parse(line_stream, meta)
 
     if 'nl2lb' in pargs or 'nl2br' in pargs:
         node = nodes.LinebreakNode().append_child(node)
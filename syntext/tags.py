@@ -2,33 +2,95 @@
 # Functions for registering and processing tags.
 # ------------------------------------------------------------------------------
 
+import functools
 import html
 import re
+import sys
 
 from . import nodes
 from . import parsers
 from . import utils
 
 
-# Use the Pygments module for syntax highlighting, if it's available.
-try:
-    import pygments
-    import pygments.lexers
-    import pygments.formatters
-except ImportError:
-    pygments = None
+# Use the Pygments module for syntax highlighting, if it's available. The
+# import is deferred until a code block actually asks for highlighting --
+# loading Pygments' lexer registry is expensive and most documents never
+# need it.
+pygments = None
+
+
+# Imports Pygments on first use. Returns the module, or False if it isn't
+# installed.
+def load_pygments():
+    global pygments
+    if pygments is None:
+        try:
+            import pygments as module
+            import pygments.lexers
+            import pygments.formatters
+            pygments = module
+        except ImportError:
+            pygments = False
+    return pygments
+
+
+# Returns the Pygments lexer for the named language, or None if there's no
+# matching lexer. Cached -- lexer lookup walks Pygments' plugin registry.
+@functools.lru_cache(maxsize=None)
+def get_lexer(lang):
+    try:
+        return pygments.lexers.get_lexer_by_name(lang)
+    except pygments.util.ClassNotFound:
+        return None
+
+
+# Returns a shared HtmlFormatter instance for highlighting code samples.
+@functools.lru_cache(maxsize=None)
+def get_formatter():
+    return pygments.formatters.HtmlFormatter(nowrap=True)
+
+
+# A table line specifying cell alignment, e.g. | :--- | :---: | ---: |
+re_table_align = re.compile(r'[ |-]*[:][ |:-]*')
+
+# Characters permitted in a decorative table line, e.g. | ----- | ----- |
+table_decor_chars = ' |:-'
+
+# A dashed tag name, treated as an alias for 'hr'.
+re_hr = re.compile(r'-+')
+
+
+# Returns true if the line is a decorative table line. lstrip's C-level scan
+# over the four-character set beats firing up the regex engine per row.
+def is_table_decor(line):
+    return bool(line) and not line.lstrip(table_decor_chars)
+
+
+# The replacements html.escape makes, fused into a single translate table so
+# short attribute values can be escaped in one pass.
+escape_table = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#x27;',
+})
 
 
 # Map tags to registered handler functions.
 tagmap = {}
 
+# Bound lookup method for the dispatcher below -- saves the attribute fetch
+# on every tag. Stays valid as later registrations mutate the dict.
+tagmap_get = tagmap.get
+
 
 # Decorator function for registering tag handlers.
 def register(*tags):
 
     def register_tag_handler(func):
         for tag in tags:
-            tagmap[tag] = func
+            tagmap[sys.intern(tag)] = func
         return func
 
     return register_tag_handler
@@ -36,9 +98,10 @@ def register(*tags):
 
 # Process a tag.
 def process(tag, pargs, kwargs, line_stream, meta):
-    if tag in tagmap:
-        node = tagmap[tag](tag, pargs, kwargs, line_stream, meta)
-    elif tag == 'hr' or re.fullmatch(r'-+', tag):
+    handler = tagmap_get(tag)
+    if handler is not None:
+        node = handler(tag, pargs, kwargs, line_stream, meta)
+    elif tag == 'hr' or (tag[:1] == '-' and re_hr.fullmatch(tag)):
         node = nodes.Node('hr', kwargs, is_void=True)
     else:
         raise utils.SyntextError("Unrecognized tag '%s'." % tag)
@@ -52,7 +115,7 @@ def process(tag, pargs, kwargs, line_stream, meta):
 @register('div')
 def div_tag_handler(tag, pargs, kwargs, line_stream, meta):
     node = nodes.Node('div', kwargs)
-    node.children = parsers.BlockParser().parse(line_stream, meta)
+    node.children = parsers.block_parser.parse(line_stream, meta)
     return node
 
 
@@ -60,7 +123,7 @@ def div_tag_handler(tag, pargs, kwargs, line_stream, meta):
 @register('span')
 def span_tag_handler(tag, pargs, kwargs, line_stream, meta):
     node = nodes.Node('span', kwargs)
-    node.children = parsers.InlineParser().parse(line_stream, meta)
+    node.children = parsers.inline_parser.parse(line_stream, meta)
     return node
 
 
@@ -68,7 +131,7 @@ def span_tag_handler(tag, pargs, kwargs, line_stream, meta):
 @register('link')
 def link_tag_handler(tag, pargs, kwargs, line_stream, meta):
     node = nodes.Node('a', kwargs)
-    node.children = parsers.InlineParser().parse(line_stream, meta)
+    node.children = parsers.inline_parser.parse(line_stream, meta)
     if not 'href' in kwargs:
         node.attributes['href'] = pargs[0] if pargs else ''
     return node
@@ -78,7 +141,7 @@ def link_tag_handler(tag, pargs, kwargs, line_stream, meta):
 @register('quote')
 def quote_tag_handler(tag, pargs, kwargs, line_stream, meta):
     quote = nodes.Node('blockquote', kwargs)
-    quote.children = parsers.BlockParser().parse(line_stream, meta)
+    quote.children = parsers.block_parser.parse(line_stream, meta)
     if pargs:
         caption = nodes.Node('p')
         caption.add_class('blockquote-caption')
@@ -95,7 +158,7 @@ def quote_tag_handler(tag, pargs, kwargs, line_stream, meta):
 def infobox_tag_handler(tag, pargs, kwargs, line_stream, meta):
     node = nodes.Node('div', kwargs)
     node.add_class(tag)
-    node.children = parsers.BlockParser().parse(line_stream, meta)
+    node.children = parsers.block_parser.parse(line_stream, meta)
     return node
 
 
@@ -106,8 +169,10 @@ def image_tag_handler(tag, pargs, kwargs, line_stream, meta):
     image.attributes['src'] = pargs[0] if pargs else ''
     outernode = image
 
-    if line_stream.has_next() and line_stream.peek().startswith('[') and line_stream.peek().endswith(']'):
-        image.attributes['alt'] = html.escape(line_stream.next()[1:-1])
+    if line_stream.has_next():
+        line = line_stream.peek()
+        if line.startswith('[') and line.endswith(']'):
+            image.attributes['alt'] = line_stream.next()[1:-1].translate(escape_table)
 
     if tag == '!image':
         link = nodes.Node('a')
@@ -150,21 +215,21 @@ def code_tag_handler(tag, pargs, kwargs, line_stream, meta):
         node.attributes['data-lang'] = lang
         node.add_class('lang-%s' % lang)
 
-    if meta.get('pygmentize') and pygments and lang:
-        try:
-            lexer = pygments.lexers.get_lexer_by_name(lang)
-        except pygments.util.ClassNotFound:
+    if meta.get('pygmentize') and lang and load_pygments():
+        lexer = get_lexer(lang)
+        if lexer is None:
             try:
                 lexer = pygments.lexers.guess_lexer(text)
             except pygments.util.ClassNotFound:
                 lexer = None
         if lexer:
             node.add_class('pygments')
-            formatter = pygments.formatters.HtmlFormatter(nowrap=True)
-            node.text = pygments.highlight(text, lexer, formatter).strip('\n')
+            node.text = pygments.highlight(text, lexer, get_formatter()).strip('\n')
             return node
 
-    node.text = html.escape(text, quote=False)
+    if '&' in text or '<' in text or '>' in text:
+        text = html.escape(text, quote=False)
+    node.text = text
     return node
 
 
@@ -181,15 +246,21 @@ def insert_tag_handler(tag, pargs, kwargs, line_stream, meta):
 @register('table')
 def table_tag_handler(tag, pargs, kwargs, line_stream, meta):
 
-    # Strip any outer pipes and discard any blank lines.
-    lines = [line.strip('|') for line in line_stream.lines if line]
+    # Strip any outer pipes, discard any blank lines, and split each line
+    # into its cells once. Structure detection below works on the raw lines;
+    # row assembly reuses the cached splits.
+    rows = []
+    for line in line_stream.lines:
+        if line:
+            line = line.strip('|')
+            rows.append((line, line.split('|')))
 
     # Check for a line with colons specifying cell alignment.
     alignment = []
-    for line in lines:
-        match = re.fullmatch(r'[ |-]*[:][ |:-]*', line)
-        if match:
-            for cell in [cell.strip() for cell in line.split('|')]:
+    for line, cells in rows:
+        if re_table_align.fullmatch(line):
+            for cell in cells:
+                cell = cell.strip()
                 if cell.startswith(':') and cell.endswith(':'):
                     alignment.append('center')
                 elif cell.startswith(':'):
@@ -201,37 +272,50 @@ def table_tag_handler(tag, pargs, kwargs, line_stream, meta):
             break
 
     # If we have a decorative top line, strip it.
-    if lines and re.fullmatch(r'[ |:-]+', lines[0]):
-        lines.pop(0)
+    if rows and is_table_decor(rows[0][0]):
+        rows.pop(0)
 
     # If we have a decorative bottom line, strip it.
-    if lines and re.fullmatch(r'[ |:-]+', lines[-1]):
-        lines.pop()
+    if rows and is_table_decor(rows[-1][0]):
+        rows.pop()
 
     # Do we have a header?
     header = None
-    if len(lines) > 2 and re.fullmatch(r'[ |:-]+', lines[1]):
-        header = [cell.strip() for cell in lines[0].split('|')]
-        lines = lines[2:]
+    if len(rows) > 2 and is_table_decor(rows[1][0]):
+        header = [cell.strip() for cell in rows[0][1]]
+        rows = rows[2:]
 
     # Do we have a footer?
     footer = None
-    if len(lines) > 2 and re.fullmatch(r'[ |:-]+', lines[-2]):
-        footer = [cell.strip() for cell in lines[-1].split('|')]
-        lines = lines[:-2]
+    if len(rows) > 2 and is_table_decor(rows[-2][0]):
+        footer = [cell.strip() for cell in rows[-1][1]]
+        rows = rows[:-2]
 
     # Assemble the table body.
-    body = [[cell.strip() for cell in line.split('|')] for line in lines]
-
-    # Make a row of cells using the specified tag.
+    body = [[cell.strip() for cell in cells] for _, cells in rows]
+
+    # Pad the alignment list out to the widest row so make_row can index it
+    # directly instead of bounds-checking every cell.
+    width = max((len(cells) for cells in body), default=0)
+    if header and len(header) > width:
+        width = len(header)
+    if footer and len(footer) > width:
+        width = len(footer)
+    if len(alignment) < width:
+        alignment.extend([None] * (width - len(alignment)))
+
+    # Make a row of cells using the specified tag. Appends to the child
+    # lists directly -- on a wide table the append_child wrappers add a
+    # method call per cell for no benefit.
     def make_row(cells, tag):
         tr = nodes.Node('tr')
+        row = tr.children
         for index, text in enumerate(cells):
             cell = nodes.Node(tag)
-            cell.append_child(nodes.TextNode(text))
-            if len(alignment) > index and alignment[index]:
+            cell.children.append(nodes.TextNode(text))
+            if alignment[index]:
                 cell.add_class(alignment[index])
-            tr.append_child(cell)
+            row.append(cell)
         return tr
 
     # Assemble the table node.
@@ -279,7 +363,7 @@ def footnote_tag_handler(tag, pargs, kwargs, line_stream, meta):
 
     # Generate a <dd> node containing the parsed footnote body.
     body = nodes.Node('dd')
-    body.children = parsers.BlockParser().parse(line_stream, meta)
+    body.children = parsers.block_parser.parse(line_stream, meta)
     footnote.append_child(body)
 
     # Generate a footnotes <dl> node if we haven't done so already.
@@ -6,6 +6,19 @@ from . import nodes
 from . import utils
 
 
+# A single entry in the table of contents. Slotted -- long documents carry
+# hundreds of these and attribute access also beats dict indexing.
+class TocEntry:
+
+    __slots__ = ('level', 'text', 'id', 'subs')
+
+    def __init__(self, level, text, id):
+        self.level = level
+        self.text = text
+        self.id = id
+        self.subs = []
+
+
 # Table of Contents Builder
 #
 # Processes a tree of block elements to produce a table of contents with links
@@ -20,22 +33,30 @@ from . import utils
 #
 class TOCBuilder:
 
+    heading_tags = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+
     def __init__(self, node):
-        self.root = dict(level=0, text='ROOT', id='', subs=[])
+        self.root = TocEntry(0, 'ROOT', '')
         self.stack = [self.root]
-        self.ids = []
-        self._process_node(node)
+        self.ids = set()
+        self._process_tree(node)
 
-    def _process_node(self, node):
-        if node.tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
-            heading = self._make_toc_node(node)
-            while heading['level'] <= self.stack[-1]['level']:
-                self.stack.pop()
-            self.stack[-1]['subs'].append(heading)
-            self.stack.append(heading)
-        else:
-            for child in node.children:
-                self._process_node(child)
+    # Walks the tree with an explicit stack instead of recursing -- deeply
+    # nested documents would otherwise pay a Python frame per node and can
+    # hit the recursion limit. Children are pushed in reverse so headings
+    # are visited in document order.
+    def _process_tree(self, node):
+        todo = [node]
+        while todo:
+            node = todo.pop()
+            if node.tag in self.heading_tags:
+                heading = self._make_toc_node(node)
+                while heading.level <= self.stack[-1].level:
+                    self.stack.pop()
+                self.stack[-1].subs.append(heading)
+                self.stack.append(heading)
+            elif node.children:
+                todo.extend(reversed(node.children))
 
     def _make_toc_node(self, node):
         level = int(node.tag[1])
@@ -51,16 +72,16 @@ class TOCBuilder:
                 id = '%s-%s' % (slug, index)
                 index += 1
             node.attributes['id'] = id
-        self.ids.append(id)
-        return dict(level=level, text=text, id=id, subs=[])
+        self.ids.add(id)
+        return TocEntry(level, text, id)
 
     # Returns the table of contents as an unordered list. Skips over root-level
     # H1 headings.
     def toc(self):
         ul = nodes.Node('ul', {'class': 'stx-toc'})
-        for node in self.root['subs']:
-            if node['level'] == 1:
-                for subnode in node['subs']:
+        for node in self.root.subs:
+            if node.level == 1:
+                for subnode in node.subs:
                     ul.append_child(self._make_li_node(subnode))
             else:
                 ul.append_child(self._make_li_node(node))
@@ -70,16 +91,16 @@ class TOCBuilder:
     # H1 headings.
     def fulltoc(self):
         ul = nodes.Node('ul', {'class': 'stx-toc'})
-        for node in self.root['subs']:
+        for node in self.root.subs:
             ul.append_child(self._make_li_node(node))
         return ul
 
     def _make_li_node(self, node):
         li = nodes.Node('li')
-        li.append_child(nodes.TextNode('[%s](#%s)' % (node['text'], node['id'])))
-        if node['subs']:
+        li.append_child(nodes.TextNode('[%s](#%s)' % (node.text, node.id)))
+        if node.subs:
             ul = nodes.Node('ul')
             li.append_child(ul)
-            for child in node['subs']:
+            for child in node.subs:
                 ul.append_child(self._make_li_node(child))
         return li
@@ -18,8 +18,12 @@ class SyntextError(Error):
 
 
 # Makes input text available as a stream of lines. Strips newlines.
+# Slotted -- a parse allocates a stream per nested block, and skipping the
+# per-instance dict keeps them small.
 class LineStream:
 
+    __slots__ = ('lines', 'index')
+
     # A stream can be initialized with a string or a list of lines.
     def __init__(self, text=None):
         if isinstance(text, str):
@@ -43,35 +47,54 @@ class LineStream:
     def prepend(self, line):
         self.lines.insert(0, line)
 
-    # Strips the common leading indent from all lines in the stream.
+    # Strips the common leading indent from all lines in the stream. Indents
+    # are measured with lstrip rather than a per-character Python loop.
     def dedent(self):
-
-        def countspaces(line):
-            for index, char in enumerate(line):
-                if char != ' ':
-                    return index
-
-        mindent = min((countspaces(l) for l in self.lines if l), default=0)
-
-        for index, line in enumerate(self.lines):
-            if line:
-                self.lines[index] = line[mindent:]
-
+        mindent = min(
+            (len(l) - len(l.lstrip(' ')) for l in self.lines if l), default=0)
+        if mindent:
+            self.lines = [l[mindent:] if l else l for l in self.lines]
         return self
 
     # Indents all non-blank lines in the stream by n spaces.
     def indent(self, n=4):
-        for index, line in enumerate(self.lines):
-            if line:
-                self.lines[index] = ' ' * n + line
+        pad = ' ' * n
+        self.lines = [pad + line if line else line for line in self.lines]
         return self
 
-    # Strips leading and trailing blank lines.
+    # Strips leading and trailing blank lines. Locates the content range
+    # first and reslices once -- popping leading lines one at a time shuffles
+    # the whole list down per pop.
     def trim(self):
-        while self.lines and self.lines[0] == '':
-            self.lines.pop(0)
-        while self.lines and self.lines[-1] == '':
-            self.lines.pop()
+        lines = self.lines
+        start, end = 0, len(lines)
+        while start < end and lines[start] == '':
+            start += 1
+        while end > start and lines[end - 1] == '':
+            end -= 1
+        if start > 0 or end < len(lines):
+            self.lines = lines[start:end]
+        return self
+
+    # Fused trim + dedent: strips leading and trailing blank lines and the
+    # common indent, scanning the lines once instead of three times.
+    def normalize(self):
+        lines = self.lines
+        start, end, indent = None, 0, None
+        for index, line in enumerate(lines):
+            if line:
+                if start is None:
+                    start = index
+                end = index + 1
+                lineindent = len(line) - len(line.lstrip(' '))
+                if indent is None or lineindent < indent:
+                    indent = lineindent
+        if start is None:
+            self.lines = []
+        elif indent:
+            self.lines = [line[indent:] for line in lines[start:end]]
+        else:
+            self.lines = lines[start:end]
         return self
 
     # Returns the next item in the stream without consuming it.
@@ -87,6 +110,17 @@ class LineStream:
     def rewind(self, n):
         self.index -= n
 
+    # Consumes lines for as long as pred(line) is true and returns them as a
+    # list, captured as a single slice of the underlying line list.
+    def consume_while(self, pred):
+        lines = self.lines
+        start = index = self.index
+        end = len(lines)
+        while index < end and pred(lines[index]):
+            index += 1
+        self.index = index
+        return lines[start:index]
+
     # Returns true if the stream contains at least one more item.
     def has_next(self):
         return self.index < len(self.lines)
@@ -99,10 +133,7 @@ class LineStream:
 
     # Returns true if the stream contains at least one blank line.
     def contains_blank(self):
-        for line in self.lines:
-            if line == '':
-                return True
-        return False
+        return '' in self.lines
 
 
 # Utility class for parsing argument strings.
@@ -110,7 +141,7 @@ class ArgParser:
 
     args_regex = re.compile(r"""
         (?:([^\s'"=]+)=)?           # an optional key, followed by...
-        (
+        (?:
             "((?:[^\\"]|\\.)*)"     # a double-quoted value, or
             |
             '((?:[^\\']|\\.)*)'     # a single-quoted value
@@ -125,32 +156,42 @@ class ArgParser:
         pargs, kwargs, classes = [], {}, []
 
         # Parse the argument string into a list of positional and dictionary
-        # of keyword arguments.
+        # of keyword arguments. The group accessor and list append are bound
+        # to locals -- this loop runs once per token for every tagged block.
+        pargs_append = pargs.append
         for match in self.args_regex.finditer(argstr):
-            if match.group(2) or match.group(5):
-                key = match.group(1) or match.group(5)
-                value = match.group(3) or match.group(4) or match.group(6)
-                if match.group(3) or match.group(4):
+            group = match.group
+            dquoted, squoted = group(2), group(3)
+            if dquoted is not None or squoted is not None:
+                value = dquoted or squoted
+                if value:
                     value = bytes(value, 'utf-8').decode('unicode_escape')
+                else:
+                    value = None
+                key = group(1)
                 if key:
                     kwargs[key] = value
                 else:
-                    pargs.append(value)
+                    pargs_append(value)
+            elif group(4):
+                kwargs[group(4)] = group(5)
             else:
-                pargs.append(match.group(7))
+                pargs_append(group(6))
 
         # Parse any .classes, #ids, or &attributes from the list of
         # positional arguments.
-        for arg in pargs[:]:
-            if arg.startswith('.'):
+        filtered = []
+        for arg in pargs:
+            prefix = arg[:1]
+            if prefix == '.':
                 classes.append(arg[1:])
-                pargs.remove(arg)
-            if arg.startswith('#'):
+            elif prefix == '#':
                 kwargs['id'] = arg[1:]
-                pargs.remove(arg)
-            if arg.startswith('&'):
-                kwargs[arg.lstrip('&')] = None
-                pargs.remove(arg)
+            elif prefix == '&':
+                kwargs[arg[1:]] = None
+            else:
+                filtered.append(arg)
+        pargs = filtered
 
         # Convert the classes list into a space-separated string.
         # We need to keep an eye out for a named 'class' attribute.
@@ -162,6 +203,11 @@ class ArgParser:
         return pargs, kwargs
 
 
+# Shared parser instance. ArgParser carries no state between calls so every
+# tag and shorthand block can reuse the one object.
+arg_parser = ArgParser()
+
+
 # Formats title text for output on the command line.
 def title(text):
     cols, _ = shutil.get_terminal_size()
@@ -169,19 +215,41 @@ def title(text):
     return line + '\n' + text.center(cols) + '\n' + line
 
 
+# An angle-bracket-enclosed substring, i.e. a html tag.
+re_angle_brackets = re.compile(r'<[^>]*>')
+
+# Patterns for cleaning up #id text. Compiled once here so idify() doesn't
+# hit the re module's pattern cache on every heading.
+re_html_entity = re.compile(r'&[#a-zA-Z0-9]+;')
+re_dashes = re.compile(r'--+')
+re_leading_digit = re.compile(r'^(\d)')
+
+# Character cleanup table for idify(): lowercases ascii letters, deletes
+# apostrophes, and maps everything else outside [a-z0-9-] to a dash for the
+# collapse step. One translate() pass replaces separate lower, replace and
+# substitution passes.
+id_table = {}
+for code in range(128):
+    char = chr(code)
+    if 'A' <= char <= 'Z':
+        id_table[code] = code + 32
+    elif char == "'":
+        id_table[code] = None
+    elif not ('a' <= char <= 'z' or '0' <= char <= '9' or char == '-'):
+        id_table[code] = '-'
+
+
 # Strips all angle-bracket-enclosed substrings.
 def strip_tags(text):
-    return re.sub(r'<[^>]*>', '', text)
+    return re_angle_brackets.sub('', text)
 
 
 # Processes a string for use as an #id.
 def idify(s):
     s = unicodedata.normalize('NFKD', s)
     s = s.encode('ascii', 'ignore').decode('ascii')
-    s = s.lower()
-    s = s.replace("'", '')
-    s = re.sub(r'&[#a-zA-Z0-9]+;', '-', s)
-    s = re.sub(r'[^a-z0-9-]+', '-', s)
-    s = re.sub(r'--+', '-', s).strip('-')
-    s = re.sub(r'^(\d)', r'id-\1', s)
+    s = re_html_entity.sub('-', s)
+    s = s.translate(id_table)
+    s = re_dashes.sub('-', s).strip('-')
+    s = re_leading_digit.sub(r'id-\1', s)
     return s or 'id'